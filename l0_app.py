@@ -1,114 +1,411 @@
 import os
+import io
+import re
 import bz2
+import html as html_entities
+import hashlib
+import tempfile
+import queue
+import threading
+import time
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import diskcache
+import numpy as np
 import pandas as pd
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, DiskcacheManager, dcc, html, Input, Output, State
 import dash_bootstrap_components as dbc
-import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
 from urllib.parse import urljoin
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from flask_caching import Cache
 
 BASE_URL = "https://data.ovh.pandonia-global-network.org/"
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S.%fZ"  # e.g. 20240101T123456.7Z
+HEADER_SCAN_SIZE = 64 * 1024  # Upper bound on the size of an L0 file header
+SEPARATOR_PATTERN = re.compile(rb"^-{20,}[^\n]*\n", re.MULTILINE)  # Header separator lines
+HREF_PATTERN = re.compile(rb'href="\./([^"/?#]+)/?"')  # Entries linked from an autoindex page
+HTTP_TIMEOUT = (3, 30)  # Seconds to wait on the data server to connect and to respond
+LISTING_TTL = 300  # Seconds a directory listing is reused before it is fetched again
+FILE_CACHE_SIZE = 256 * 1024 * 1024  # Byte budget for downloaded files kept in the file cache
+FILE_CACHE_MAX_ITEM = 32 * 1024 * 1024  # Downloaded files larger than this are not cached
+STREAM_CHUNK_SIZE = 128 * 1024  # Bytes per chunk when streaming a file download
+PIPELINE_DEPTH = 16  # Chunks a background download may read ahead of the parser
+DF_CACHE_SIZE = 4  # Number of parsed files kept in memory
+CACHE_TIMEOUT = 3600  # Seconds a downloaded or parsed file stays in the shared cache
+MAX_PLOT_POINTS = 2000  # Upper bound on the points sent to the browser per chart
+PREFETCH_WORKERS = 2  # Threads that warm caches ahead of the user's next selection
+LISTING_WORKERS = 8  # Directory listings fetched at once
+PREFETCH_DEVICES = 10  # Devices whose file lists are fetched as soon as a location is picked
+
+# Column names of an L0 data row, followed by the averaged groups of 200 pixels
+BASE_COLUMNS = (
+    "Routine Code", "Timestamp", "Routine Count", "Repetition Count",
+    "Duration", "Integration Time [ms]", "Number of Cycles", "Saturation Index",
+    "Filterwheel 1", "Filterwheel 2", "Zenith Angle [deg]", "Zenith Mode",
+    "Azimuth Angle [deg]", "Azimuth Mode", "Processing Index", "Target Distance [m]",
+    "Electronics Temp [°C]", "Control Temp [°C]", "Aux Temp [°C]", "Head Sensor Temp [°C]",
+    "Head Sensor Humidity [%]", "Head Sensor Pressure [hPa]", "Scale Factor", "Uncertainty Indicator",
+)
+PIXEL_COLUMNS = tuple(f"Pixel {i}-{i + 199}" for i in range(1, 2001, 200))
+NUMERIC_COLUMNS = BASE_COLUMNS[2:]
+COLUMN_NAMES = BASE_COLUMNS + PIXEL_COLUMNS
+FIELD_NAMES = BASE_COLUMNS + tuple(range(len(BASE_COLUMNS), len(BASE_COLUMNS) + 2000))  # Fields read from a data row
+
+# Serialize figures in Dash's responses with orjson
+pio.json.config.default_engine = "orjson"
 
 # Initialize the Dash app
 app = Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 server = app.server
 app.title = "Pandonia Data Viewer - L0"
-uploaded_df = None  # Global variable to hold the DataFrame
+# Listings and parsed files are shared between worker processes through the
+# filesystem, as are downloads in file_cache below
+cache = Cache(server, config={
+    "CACHE_TYPE": "FileSystemCache",
+    "CACHE_DIR": os.environ.get("L0_CACHE_DIR", os.path.join(tempfile.gettempdir(), "l0-web-cache")),
+    "CACHE_THRESHOLD": 32,
+    "CACHE_DEFAULT_TIMEOUT": CACHE_TIMEOUT,
+})
+# Downloads get a cache of their own, whose entry limit keeps them within
+# the byte budget as no entry is larger than FILE_CACHE_MAX_ITEM
+file_cache = Cache(server, config={
+    "CACHE_TYPE": "FileSystemCache",
+    "CACHE_DIR": os.environ.get("L0_FILE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "l0-web-files")),
+    "CACHE_THRESHOLD": FILE_CACHE_SIZE // FILE_CACHE_MAX_ITEM,
+    "CACHE_DEFAULT_TIMEOUT": CACHE_TIMEOUT,
+})
+# File loads run as background jobs so a long parse never ties up a web worker
+background_manager = DiskcacheManager(diskcache.Cache(
+    os.environ.get("L0_JOB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "l0-web-jobs"))
+))
+
+def create_http_session():
+    """Create a session that keeps connections to the data server open for reuse."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.3)))
+    return session
+
+http_session = create_http_session()  # Shared so connections are reused across requests
+df_cache = OrderedDict()  # (File URL, version) -> parsed DataFrame, least recently used first
+df_cache_lock = threading.Lock()
+prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)  # Warms caches ahead of the user's next selection
+listing_pool = ThreadPoolExecutor(max_workers=LISTING_WORKERS)  # Fetches several directory listings at once
+
+def reset_after_fork():
+    """Give a forked process, such as a background job, its own connections, locks and pools."""
+    # The parent keeps using its sockets, may have held a lock at the moment
+    # of the fork, and its pool threads do not exist in the child
+    global http_session, df_cache_lock, prefetch_pool, listing_pool
+    http_session = create_http_session()
+    df_cache_lock = threading.Lock()
+    prefetch_pool = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS)
+    listing_pool = ThreadPoolExecutor(max_workers=LISTING_WORKERS)
+
+os.register_at_fork(after_in_child=reset_after_fork)
+
+def shared_cache_key(kind, url):
+    """Key under which data of the given kind for a URL is shared between workers."""
+    return f"{kind}-" + hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+@cache.memoize(timeout=LISTING_TTL)
+def fetch_listing(base_url):
+    """Fetch the names linked from a directory listing."""
+    response = http_session.get(base_url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return [
+        html_entities.unescape(href.decode("utf-8", errors="replace"))
+        for href in HREF_PATTERN.findall(response.content)
+    ]
 
 def list_items(base_url):
     """List items available at the given URL."""
     try:
-        response = requests.get(base_url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-        items = [
-            link["href"].lstrip("./").rstrip("/")
-            for link in soup.find_all("a", href=True)
-            if link["href"].startswith("./")
-        ]
-        return items
+        return fetch_listing(base_url)
     except Exception as e:
         print(f"Error listing items: {e}")
         return []
 
-def fetch_file(file_url):
-    """Fetch file content from the given URL."""
+def prefetch_listings(base_urls):
+    """Warm the listings at several URLs in the background."""
+    for base_url in base_urls:
+        listing_pool.submit(list_items, base_url)
+
+def file_version(etag, last_modified):
+    """Identify a version of a file by its validators, or uniquely if it has none."""
+    if etag or last_modified:
+        return f"{etag} {last_modified}"
+    return f"unversioned {time.time_ns()}"
+
+def iter_download(response, cache_key):
+    """Yield the chunks of a streamed response, caching the whole file once it is complete."""
+    with response:
+        # Keep the downloaded chunks for the cache unless the file is too large
+        chunks = []
+        size = 0
+        for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            if chunks is not None and size > FILE_CACHE_MAX_ITEM:
+                chunks = None
+            elif chunks is not None:
+                chunks.append(chunk)
+            yield chunk
+        print(f"Fetched file content size: {size} bytes.")  # Debug
+        if chunks is not None:
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            file_cache.set(cache_key, validators + (b"".join(chunks),))
+
+def iter_cached(content):
+    """Yield cached file content in download-sized chunks."""
+    content = memoryview(content)
+    for offset in range(0, len(content), STREAM_CHUNK_SIZE):
+        yield content[offset:offset + STREAM_CHUNK_SIZE]
+
+def open_file(file_url, validators=None, max_size=None):
+    """Request the file at the given URL, returning its validators and an iterator over its content.
+
+    validators are the (ETag, Last-Modified) of a copy the caller already
+    has; the content is None if the file has not changed since. Without
+    them, a copy in the file cache is revalidated and reused instead. The
+    content is also None if the server reports a size above max_size.
+    """
+    cache_key = shared_cache_key("file", file_url)
+    cached = file_cache.get(cache_key) if validators is None else None  # (ETag, Last-Modified, content)
+    if cached is not None:
+        validators = cached[:2]
+
+    # Revalidate the copy so the server only resends the file if it changed
+    headers = {}
+    if validators is not None:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    response = http_session.get(file_url, headers=headers, stream=True, timeout=HTTP_TIMEOUT)
+    if headers and response.status_code == 304:
+        response.close()
+        return validators, iter_cached(cached[2]) if cached is not None else None
     try:
-        response = requests.get(file_url)
         response.raise_for_status()
-        return response.content
-    except Exception as e:
-        print(f"Error fetching file: {e}")
-        return None
+    except Exception:
+        response.close()
+        raise
+    validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    if max_size is not None and int(response.headers.get("Content-Length", 0)) > max_size:
+        response.close()
+        return validators, None
+    return validators, iter_download(response, cache_key)
 
-def decompress_bz2_file(file_content):
-    """Decompress a .bz2 file and return its content as a string."""
+def prefetch_file(file_url):
+    """Download a file into the file cache ahead of its selection."""
     try:
-        decompressed_content = bz2.decompress(file_content).decode("utf-8", errors="replace")
-        return decompressed_content
+        # A file too large to be cached would be downloaded for nothing
+        _, chunks = open_file(file_url, max_size=FILE_CACHE_MAX_ITEM)
+        if chunks is None:
+            return
+        # Only the file cache keeps the content, so the chunks are dropped
+        # as they arrive; without a Content-Length the size shows up here
+        size = 0
+        for chunk in chunks:
+            size += len(chunk)
+            if size > FILE_CACHE_MAX_ITEM:
+                break
+        chunks.close()
     except Exception as e:
-        print(f"Error decompressing file: {e}")
-        return ""
+        print(f"Error prefetching file: {e}")
+
+def iter_in_background(chunks, depth=PIPELINE_DEPTH):
+    """Run a chunk iterator in a worker thread so it overlaps with the consumer."""
+    buffer = queue.Queue(maxsize=depth)
+    cancelled = threading.Event()
+    finished = object()
+
+    def put(item):
+        # Give up once the consumer has stopped reading
+        while not cancelled.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
 
-def process_txt_file(file_content):
-    """Process the TXT file content, handling metadata and aggregating pixel values."""
+    def produce():
+        try:
+            for chunk in chunks:
+                if not put(chunk):
+                    return
+        except Exception as e:
+            put(e)
+            return
+        put(finished)
+
+    threading.Thread(target=produce, daemon=True).start()
     try:
-        # Split file into lines
-        lines = file_content.split("\n")
-        data_start = 0
+        while True:
+            item = buffer.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
 
-        # Find the start of the data section
-        for i, line in enumerate(lines):
-            if line.startswith("---------------------------------------------------------------------------------------"):
-                data_start = i + 1
+def decompress_bz2_file(chunks):
+    """Decompress a stream of .bz2 chunks, yielding the decompressed data."""
+    decompressor = bz2.BZ2Decompressor()
+    stream_ended = False  # Whether at least one complete stream was read
+    for chunk in chunks:
+        while chunk:
+            try:
+                data = decompressor.decompress(chunk)
+            except OSError:
+                # Like bz2.decompress, ignore trailing data after the last
+                # stream that is not a valid stream itself
+                if stream_ended:
+                    return
+                raise
+            yield data
+            if not decompressor.eof:
                 break
+            # Multi-stream archive: continue with the data after this stream
+            chunk = decompressor.unused_data
+            decompressor = bz2.BZ2Decompressor()
+            stream_ended = True
 
-        # Extract data lines
-        data_lines = lines[data_start:]
-        data = [line.split() for line in data_lines if line.strip() and not line.startswith("#")]
+class ChunkReader(io.RawIOBase):
+    """Read-only binary file object over an iterable of byte chunks."""
 
-        print(f"Loaded {len(data)} rows of data.")  # Debug
-        if len(data) == 0:
-            raise ValueError("No valid data found in the file.")
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.pending = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = memoryview(chunk)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+def read_data_section(file_obj, pixel_type=np.float32, trim_rows=True):
+    """Read the data rows of an L0 file, keeping the base columns and the first 2000 pixels."""
+    # The few distinct routine codes are read as a categorical, so filtering
+    # compares integer codes and no object column is ever built, and the
+    # pixels are converted straight to pixel_type for the reduction. Without
+    # a pixel_type they are inferred, so stray tokens can be coerced later
+    column_types = {"Routine Code": "category", "Timestamp": str}
+    if pixel_type is not None:
+        column_types.update(dict.fromkeys(FIELD_NAMES[len(BASE_COLUMNS):], pixel_type))
+    return pd.read_csv(
+        file_obj,
+        sep=r"\s+",
+        engine="c",
+        header=None,
+        # Naming exactly the used fields pads short rows with NaN; usecols
+        # keeps the rest of long rows from being read, but needs at least one
+        # row that reaches the last named field
+        names=FIELD_NAMES,
+        usecols=range(len(FIELD_NAMES)) if trim_rows else None,
+        comment="#",
+        dtype=column_types,
+        low_memory=pixel_type is not None,  # Undeclared pixels are inferred from whole columns, not per chunk
+        encoding="latin-1",  # Data rows are ASCII; a 1:1 byte mapping never needs error handling
+    )
 
-        # Define base column names
-        base_columns = [
-            "Routine Code", "Timestamp", "Routine Count", "Repetition Count",
-            "Duration", "Integration Time [ms]", "Number of Cycles", "Saturation Index",
-            "Filterwheel 1", "Filterwheel 2", "Zenith Angle [deg]", "Zenith Mode",
-            "Azimuth Angle [deg]", "Azimuth Mode", "Processing Index", "Target Distance [m]",
-            "Electronics Temp [°C]", "Control Temp [°C]", "Aux Temp [°C]", "Head Sensor Temp [°C]",
-            "Head Sensor Humidity [%]", "Head Sensor Pressure [hPa]", "Scale Factor", "Uncertainty Indicator"
-        ]
+def process_txt_file(chunks, strict=True):
+    """Process TXT file content given as byte chunks, handling metadata and aggregating pixel values.
 
-        # Calculate pixel column names for averaged groups of 200
-        pixel_columns = [f"Pixel {i}-{i + 199}" for i in range(1, 2001, 200)]
+    Returns None if the file has to be read again with strict=False.
+    """
+    try:
+        # Collect the beginning of the file, which holds the header
+        chunks = iter(chunks)
+        head = bytearray()
+        for chunk in chunks:
+            head += chunk
+            if len(head) >= HEADER_SCAN_SIZE:
+                break
 
-        # Combine base columns and pixel columns
-        column_names = base_columns + pixel_columns
+        # Find the start of the data section (the column description block is
+        # fenced by separator lines as well, so the data follows the last one).
+        # The header is short, so only the beginning of the file is searched.
+        data_start = 0
+        for match in SEPARATOR_PATTERN.finditer(head, 0, HEADER_SCAN_SIZE):
+            data_start = match.end()
 
-        # Create DataFrame
-        df = pd.DataFrame(data, dtype=str)
+        # Stream the data section straight into the pandas C parser. If a
+        # pixel field is not a number, or no row reaches the last used field,
+        # it cannot be read this way, so the caller is asked to read the file
+        # again with strict=False
+        data = itertools.chain([head[data_start:]], chunks)
+        if strict:
+            file_obj = io.BufferedReader(ChunkReader(data), STREAM_CHUNK_SIZE)
+            try:
+                df = read_data_section(file_obj)
+            except ValueError as e:
+                print(f"Reading the data section again: {e}")  # Debug
+                return None
+        else:
+            data = b"".join(data)
+            try:
+                df = read_data_section(io.BytesIO(data), pixel_type=None)
+            except ValueError:
+                df = read_data_section(io.BytesIO(data), pixel_type=None, trim_rows=False)
 
-        # Assign dynamic column names
-        df.columns = base_columns + list(range(len(base_columns), df.shape[1]))  # Temporarily name remaining columns
+        print(f"Loaded {len(df)} rows of data.")  # Debug
+        if df.empty:
+            raise ValueError("No valid data found in the file.")
 
-        # Convert numeric columns
-        numeric_columns = base_columns[2:]
-        df[numeric_columns] = df[numeric_columns].apply(pd.to_numeric, errors="coerce")
+        # Coerce any non-numeric tokens left in the numeric columns and
+        # downcast them to the smallest integer or float type that fits
+        for col_name in NUMERIC_COLUMNS:
+            values = pd.to_numeric(df[col_name], errors="coerce")
+            downcast = "integer" if pd.api.types.is_integer_dtype(values) else "float"
+            df[col_name] = pd.to_numeric(values, downcast=downcast)
 
-        # Aggregate pixel columns
-        for i, col_name in enumerate(pixel_columns):
-            start = 24 + i * 200
-            end = start + 200
-            df[col_name] = df.iloc[:, start:end].apply(pd.to_numeric, errors="coerce").mean(axis=1)
+        # Aggregate pixel columns in groups of 200 with a single reduction
+        pixel_block = df.iloc[:, 24:2024]
+        if not strict:
+            pixel_block = pixel_block.apply(pd.to_numeric, errors="coerce")
+        pixels = pixel_block.to_numpy(dtype=np.float32, copy=False)
+        groups = pixels.reshape(len(df), len(PIXEL_COLUMNS), 200)
+        missing = np.isnan(groups)
+        if missing.any():
+            counts = groups.shape[2] - np.count_nonzero(missing, axis=2)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                means = (np.nansum(groups, axis=2) / counts).astype(np.float32)
+        else:
+            means = groups.mean(axis=2, dtype=np.float32)
 
         # Retain only the base columns and aggregated pixel columns
-        df = df[base_columns + pixel_columns]
+        pixel_df = pd.DataFrame(means, columns=list(PIXEL_COLUMNS), index=df.index)
+        df = pd.concat([df[list(BASE_COLUMNS)], pixel_df], axis=1)
+
+        # Convert Timestamp column using the fixed Pandonia format, falling
+        # back to inference only for values that do not match it
+        timestamps = pd.to_datetime(df["Timestamp"], format=TIMESTAMP_FORMAT, errors="coerce", utc=True, cache=True)
+        unmatched = timestamps.isna() & df["Timestamp"].notna()
+        if unmatched.any():
+            timestamps[unmatched] = pd.to_datetime(df.loc[unmatched, "Timestamp"], errors="coerce", utc=True)
+        df["Timestamp"] = timestamps
 
-        # Convert Timestamp column
-        df["Timestamp"] = pd.to_datetime(df["Timestamp"], errors="coerce")
+        # Keep the rows in time order
+        df = df.sort_values("Timestamp", kind="stable", ignore_index=True)
 
         return df
 
@@ -116,6 +413,142 @@ def process_txt_file(file_content):
         print(f"Error processing file: {e}")  # Log the error
         return pd.DataFrame()
 
+def remember_dataframe(file_url, version, df):
+    """Keep a parsed file in this process, evicting the least recently used ones."""
+    with df_cache_lock:
+        df_cache[file_url, version] = df
+        while len(df_cache) > DF_CACHE_SIZE:
+            df_cache.popitem(last=False)
+
+def find_dataframe(file_url, version):
+    """Return the parsed copy of the given version of a file, if one is kept."""
+    with df_cache_lock:
+        if (file_url, version) in df_cache:
+            df_cache.move_to_end((file_url, version))
+            return df_cache[file_url, version]
+
+    # Another worker may already have parsed this version
+    df = cache.get(shared_cache_key("df", f"{version} {file_url}"))
+    if df is not None:
+        remember_dataframe(file_url, version, df)
+    return df
+
+def record_chunks(chunks, record, measure=None):
+    """Yield chunks unchanged, appending each one (or measure(chunk)) to record as well."""
+    for chunk in chunks:
+        record.append(chunk if measure is None else measure(chunk))
+        yield chunk
+
+def take_bytes(chunks, size):
+    """Yield the first size bytes of a stream of chunks."""
+    for chunk in chunks:
+        if size <= 0:
+            break
+        yield chunk[:size]
+        size -= len(chunk)
+
+def decode_file_content(file_url, chunks):
+    """Stream the decompressed content of a file from its downloaded chunks."""
+    # Download and decompress in background threads while the caller parses
+    # the chunks that have already arrived
+    chunks = iter_in_background(chunks)
+    if file_url.endswith(".bz2"):
+        chunks = iter_in_background(decompress_bz2_file(chunks))  # bz2 releases the GIL
+    return chunks
+
+def load_dataframe(file_url):
+    """Fetch and parse the current version of the file at the given URL, reusing it if already parsed.
+
+    Returns the version and the DataFrame, which is empty if the file could not be loaded.
+    """
+    print(f"Fetching file from {file_url}")  # Debug
+    try:
+        # Revalidate the newest parse of the file, so a file that is still
+        # growing on the server is never served from an outdated parse, and
+        # an unchanged one is not even sent again
+        parsed = cache.get(shared_cache_key("parsed", file_url))  # (ETag, Last-Modified) of the newest parse
+        validators, chunks = open_file(file_url, parsed)
+        if chunks is None:
+            df = find_dataframe(file_url, file_version(*validators))
+            if df is not None:
+                return file_version(*validators), df
+            # That parse is no longer kept, so the file is read again
+            validators, chunks = open_file(file_url)
+        version = file_version(*validators)
+
+        # Keep the downloaded chunks and the amount of content parsed from
+        # them, so the file can be read a second time without downloading it
+        downloaded = []
+        parsed_sizes = []
+        content = decode_file_content(file_url, record_chunks(chunks, downloaded))
+        df = process_txt_file(record_chunks(content, parsed_sizes, len))
+        if df is None:
+            # The file needs the slower, tolerant path. The rest of the content
+            # is read as it arrives, which completes the download, and only
+            # the part already parsed is decompressed again from memory
+            rest = list(content)
+            parsed = take_bytes(decode_file_content(file_url, downloaded), sum(parsed_sizes))
+            df = process_txt_file(itertools.chain(parsed, rest), strict=False)
+    except Exception as e:
+        print(f"Error fetching file: {e}")
+        return None, pd.DataFrame()
+
+    if not df.empty:
+        cache.set(shared_cache_key("df", f"{version} {file_url}"), df)
+        if any(validators):
+            cache.set(shared_cache_key("parsed", file_url), validators)
+        remember_dataframe(file_url, version, df)
+    return version, df
+
+def downsample(df, column, max_points=MAX_PLOT_POINTS):
+    """Reduce a series to about max_points rows, keeping each bucket's min and max."""
+    if len(df) <= max_points:
+        return df
+    if not pd.api.types.is_numeric_dtype(df[column]):
+        return df.iloc[::-(-len(df) // max_points)]
+
+    # Split the rows into equal buckets (padding the last one with NaN) and
+    # keep the positions of the extremes of each bucket, so spikes survive
+    num_buckets = max_points // 2
+    bucket_size = -(-len(df) // num_buckets)
+    values = np.full(num_buckets * bucket_size, np.nan)
+    values[:len(df)] = df[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    buckets = values.reshape(num_buckets, bucket_size)
+    missing = np.isnan(buckets)
+    offsets = np.arange(num_buckets) * bucket_size
+    lows = np.where(missing, np.inf, buckets).argmin(axis=1) + offsets
+    highs = np.where(missing, -np.inf, buckets).argmax(axis=1) + offsets
+    positions = np.unique(np.concatenate([lows, highs]))
+    return df.iloc[positions[positions < len(df)]]
+
+def empty_figure(title):
+    """Build a chart without data that only shows a title."""
+    return go.Figure(layout_title_text=title)
+
+@lru_cache(maxsize=64)
+def build_figure(file_url, version, routine_code, column):
+    """Build the line chart for a selection; the figure is shared, so it must not be modified."""
+    df = find_dataframe(file_url, version)
+    if df is None:
+        # That copy is no longer kept, so draw the current version instead
+        _, df = load_dataframe(file_url)
+    if df.empty:
+        return empty_figure("No Data Available")
+    if not column:
+        return empty_figure("No Column Selected")
+
+    # Only the plotted columns are taken out of the cached frame
+    columns = list(dict.fromkeys(["Timestamp", column]))
+    if routine_code:
+        df = df.loc[df["Routine Code"] == routine_code, columns]
+    else:
+        df = df[columns]
+    df = downsample(df, column)
+    # A WebGL trace renders long series far faster than the SVG one px.line makes
+    fig = go.Figure(go.Scattergl(x=df["Timestamp"], y=df[column], mode="lines", name=column))
+    fig.update_layout(title_text=f"{column} Over Time", xaxis_title_text="Timestamp", yaxis_title_text=column)
+    return fig
+
 # App Layout
 app.layout = dbc.Container(
     [
@@ -154,77 +587,146 @@ app.layout = dbc.Container(
             ],
             className="mb-4",
         ),
-        dbc.Row(dbc.Col(html.Div(id="data-status"), className="text-center"), className="mb-4"),
+        dbc.Row(dbc.Col([html.Div(id="loading-status"), html.Div(id="data-status")], className="text-center"), className="mb-4"),
+        dcc.Store(id="locations-store"),  # Names of the locations on the data server
+        dcc.Store(id="devices-store"),  # Names of the devices at the selected location
+        dcc.Store(id="files-store"),  # L0 listing URL and file names of the selected device
+        dcc.Store(id="df-cache-key"),  # URL and version of the loaded file, which key the parsed data
+        dcc.Store(id="location-prefetch"),  # Location the user is about to pick, if known
         dbc.Row(dbc.Col(dcc.Graph(id="line-chart"), width=12), className="mt-4"),
     ],
     fluid=True,
 )
 
 @app.callback(
-    Output("location-dropdown", "options"),
+    Output("locations-store", "data"),
     Input("location-dropdown", "id"),
 )
 def populate_locations(_):
     """Populate the location dropdown."""
-    locations = list_items(BASE_URL)
-    return [{"label": loc, "value": loc} for loc in locations]
+    return list_items(BASE_URL)
+
+# Dropdown options are built in the browser from the plain name lists, so the
+# server only sends each list once
+NAME_OPTIONS_JS = """
+function(items) {
+    return (items || []).map(item => ({label: item, value: item}));
+}
+"""
+
+app.clientside_callback(
+    NAME_OPTIONS_JS,
+    Output("location-dropdown", "options"),
+    Input("locations-store", "data"),
+)
+
+# Once the location search matches a single location, pass it on so its
+# device list can be fetched while the user is still typing
+app.clientside_callback(
+    """
+    function(search, options) {
+        if (!search || !options) {
+            return window.dash_clientside.no_update;
+        }
+        const needle = search.toLowerCase();
+        const matches = options.filter(option => String(option.label).toLowerCase().includes(needle));
+        return matches.length === 1 ? matches[0].value : window.dash_clientside.no_update;
+    }
+    """,
+    Output("location-prefetch", "data"),
+    Input("location-dropdown", "search_value"),
+    State("location-dropdown", "options"),
+)
 
 @app.callback(
-    Output("device-dropdown", "options"),
+    Input("location-prefetch", "data"),
+)
+def prefetch_devices(location):
+    if location:
+        prefetch_pool.submit(list_items, urljoin(BASE_URL, f"{location}/"))
+
+@app.callback(
+    Output("devices-store", "data"),
     Input("location-dropdown", "value"),
 )
 def update_device_dropdown(selected_location):
     if selected_location:
         devices_url = urljoin(BASE_URL, f"{selected_location}/")
         devices = list_items(devices_url)
-        return [{"label": device, "value": device} for device in devices]
+        # Warm the file lists of a bounded number of devices (the last ones in
+        # the listing's name order) before one is picked
+        files_urls = [urljoin(devices_url, f"{device}/L0/") for device in devices[-PREFETCH_DEVICES:]]
+        prefetch_listings(files_urls)
+        return devices
     return []
 
+app.clientside_callback(
+    NAME_OPTIONS_JS,
+    Output("device-dropdown", "options"),
+    Input("devices-store", "data"),
+)
+
 @app.callback(
-    Output("file-dropdown", "options"),
+    Output("files-store", "data"),
     [Input("location-dropdown", "value"), Input("device-dropdown", "value")],
 )
 def update_file_dropdown(selected_location, selected_device):
     if selected_location and selected_device:
         files_url = urljoin(BASE_URL, f"{selected_location}/{selected_device}/L0/")
         files = list_items(files_url)
-        return [{"label": file, "value": urljoin(files_url, file)} for file in files]
-    return []
+        if files:
+            # Files are listed by date, so the newest one is the likeliest pick
+            prefetch_pool.submit(prefetch_file, urljoin(files_url, files[-1]))
+        return {"base": files_url, "items": files}
+    return None
+
+# File names are relative to the listing, so each value is the file's full URL
+app.clientside_callback(
+    """
+    function(listing) {
+        if (!listing) {
+            return [];
+        }
+        return listing.items.map(item => ({label: item, value: listing.base + item}));
+    }
+    """,
+    Output("file-dropdown", "options"),
+    Input("files-store", "data"),
+)
 
 @app.callback(
     [
+        Output("df-cache-key", "data"),
         Output("routine-code-dropdown", "options"),
         Output("column-dropdown", "options"),
         Output("data-status", "children"),
-        Output("line-chart", "figure"),
     ],
-    [Input("file-dropdown", "value"), Input("routine-code-dropdown", "value"), Input("column-dropdown", "value")],
+    Input("file-dropdown", "value"),
+    prevent_initial_call=True,  # Nothing is selected when the page loads
+    background=True,
+    manager=background_manager,
+    interval=250,
+    running=[(Output("loading-status", "children"), "Loading...", "")],
 )
-def load_and_visualize(file_url, selected_routine_code, selected_column):
+def load_file(file_url):
     if file_url:
-        print(f"Fetching file from {file_url}")  # Debug
-        file_content = fetch_file(file_url)
-        if file_content:
-            print(f"Fetched file content size: {len(file_content)} bytes.")  # Debug
-            if file_url.endswith(".bz2"):
-                file_content = decompress_bz2_file(file_content)
-                print(f"Decompressed file content size: {len(file_content)} characters.")  # Debug
-            if file_content:
-                global uploaded_df
-                uploaded_df = process_txt_file(file_content)
-                if not uploaded_df.empty:
-                    routine_codes = uploaded_df["Routine Code"].unique().tolist()
-                    routine_code_options = [{"label": code, "value": code} for code in routine_codes]
-                    column_options = [{"label": col, "value": col} for col in uploaded_df.columns if col != "Routine Code"]
-                    filtered_df = uploaded_df.copy()
-                    if selected_routine_code:
-                        filtered_df = filtered_df[filtered_df["Routine Code"] == selected_routine_code]
-                    if selected_column:
-                        fig = px.line(filtered_df, x="Timestamp", y=selected_column, title=f"{selected_column} Over Time")
-                    else:
-                        fig = px.line(title="No Column Selected")
-                    return routine_code_options, column_options, f"File loaded successfully: {file_url}", fig
-    return [], [], "File failed to load", px.line(title="No Data Available")
+        version, df = load_dataframe(file_url)
+        if not df.empty:
+            routine_codes = df["Routine Code"].cat.categories.tolist()  # Known without scanning the rows
+            routine_code_options = [{"label": code, "value": code} for code in routine_codes]
+            column_options = [{"label": col, "value": col} for col in COLUMN_NAMES if col != "Routine Code"]
+            data_key = {"url": file_url, "version": version}
+            return data_key, routine_code_options, column_options, f"File loaded successfully: {file_url}"
+    return None, [], [], "File failed to load"
+
+@app.callback(
+    Output("line-chart", "figure"),
+    [Input("df-cache-key", "data"), Input("routine-code-dropdown", "value"), Input("column-dropdown", "value")],
+)
+def visualize(data_key, selected_routine_code, selected_column):
+    if data_key:
+        return build_figure(data_key["url"], data_key["version"], selected_routine_code, selected_column)
+    return empty_figure("No Data Available")
 
 # Run the App
 if __name__ == "__main__":